@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+
+# --- FILTROS ---
+def filter_by_period(df, start_date, end_date, column="order_purchase_timestamp"):
+    # end_date é exclusivo (as páginas somam um dia à data final escolhida)
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= df[column] >= start_date
+    if end_date is not None:
+        mask &= df[column] < end_date
+    return mask
+
+
+def filter_sales(df, start_date=None, end_date=None, states=None, categories=None):
+    mask = filter_by_period(df, start_date, end_date)
+    if states is not None:
+        mask &= df["customer_state"].isin(states)
+    if categories is not None:
+        mask &= df["product_category_name_english"].isin(categories)
+    return df[mask]
+
+
+def filter_logistics(df, start_date=None, end_date=None, states=None):
+    mask = filter_by_period(df, start_date, end_date)
+    if states is not None:
+        mask &= df["customer_state"].isin(states)
+    return df[mask]
+
+
+# --- AGREGAÇÕES DE VENDAS ---
+def sales_kpis(df_filtered):
+    total_revenue = float(df_filtered["price"].sum())
+    total_orders = int(df_filtered["order_id"].nunique())
+    average_ticket = total_revenue / total_orders if total_orders > 0 else 0.0
+    unique_customers = int(df_filtered["customer_unique_id"].nunique())
+    return {
+        "total_revenue": total_revenue,
+        "total_orders": total_orders,
+        "average_ticket": average_ticket,
+        "unique_customers": unique_customers,
+    }
+
+
+def monthly_revenue(df_filtered):
+    return (
+        df_filtered.set_index("order_purchase_timestamp")
+        .resample("ME")["price"]
+        .sum()
+        .reset_index()
+    )
+
+
+def revenue_by_category(df_filtered, top_n=10):
+    return (
+        df_filtered.groupby("product_category_name_english", observed=False)["price"]
+        .sum()
+        .nlargest(top_n)
+        .sort_values()
+    )
+
+
+def payment_distribution(df_filtered):
+    return df_filtered.groupby("payment_type", observed=False)["payment_value"].sum()
+
+
+def revenue_by_state(df_filtered, top_n=10):
+    return (
+        df_filtered.groupby("customer_state", observed=False)["price"]
+        .sum()
+        .nlargest(top_n)
+        .sort_values(ascending=False)
+    )
+
+
+# --- AGREGAÇÕES DE LOGÍSTICA ---
+def logistics_kpis(df_filtered_log):
+    avg_delivery_time = float(df_filtered_log["delivery_time"].mean())
+    avg_estimated_time = float(df_filtered_log["estimated_time"].mean())
+    delay_percentage = float(
+        (df_filtered_log["delivery_status"] == "Atrasado").sum()
+        / len(df_filtered_log)
+        * 100
+    )
+    return {
+        "avg_delivery_time": avg_delivery_time,
+        "avg_estimated_time": avg_estimated_time,
+        "delay_percentage": delay_percentage,
+    }
+
+
+def delivery_status_counts(df_filtered_log):
+    return df_filtered_log["delivery_status"].value_counts()
+
+
+def monthly_delivery_time(df_filtered_log):
+    return (
+        df_filtered_log.set_index("order_purchase_timestamp")
+        .resample("ME")["delivery_time"]
+        .mean()
+        .reset_index()
+    )
+
+
+def state_performance(df_filtered_log):
+    return (
+        df_filtered_log.assign(
+            is_late=(df_filtered_log["delivery_status"] == "Atrasado").astype("int8")
+        )
+        .groupby("customer_state", observed=False)
+        .agg(
+            avg_delivery_time=("delivery_time", "mean"),
+            delay_percentage=("is_late", "mean"),
+        )
+        .assign(delay_percentage=lambda x: x["delay_percentage"] * 100)
+        .reset_index()
+    )
+
+
+# --- SÉRIE DIÁRIA PARA PREVISÃO ---
+def daily_revenue(df_forecast):
+    df_prophet = df_forecast[["order_purchase_timestamp", "price"]].copy()
+    df_prophet = (
+        df_prophet.set_index("order_purchase_timestamp")
+        .resample("D")
+        .sum()
+        .reset_index()
+    )
+    return df_prophet.rename(columns={"order_purchase_timestamp": "ds", "price": "y"})
+
+
+# --- ROTAS VENDEDOR → CLIENTE ---
+def _codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64), series.cat.categories
+    codes, uniques = pd.factorize(series)
+    return codes.astype(np.int64), uniques
+
+
+def sparse_aggregate(df_filtered_log, columns):
+    # Agrega tempo, atraso e volume apenas para as combinações que existem: os códigos
+    # inteiros das colunas formam uma chave única (base mista) e as somas saem de
+    # np.bincount, sem montar a matriz densa (ex: dezenas de milhares de vendedores).
+    keys = np.zeros(len(df_filtered_log), dtype=np.int64)
+    valid = np.ones(len(df_filtered_log), dtype=bool)
+    levels = []
+    for col in columns:
+        codes, uniques = _codes(df_filtered_log[col])
+        valid &= codes >= 0
+        keys = keys * len(uniques) + codes
+        levels.append((col, uniques))
+
+    keys = keys[valid]
+    lanes, inverse = np.unique(keys, return_inverse=True)
+    volume = np.bincount(inverse)
+    delivery_sum = np.bincount(
+        inverse, weights=df_filtered_log["delivery_time"].to_numpy()[valid]
+    )
+    late = np.bincount(
+        inverse,
+        weights=(df_filtered_log["delivery_status"] == "Atrasado").to_numpy()[valid],
+    )
+
+    result = {}
+    for col, uniques in reversed(levels):
+        result[col] = np.asarray(uniques)[lanes % len(uniques)]
+        lanes = lanes // len(uniques)
+    result = {col: result[col] for col in columns}
+    return pd.DataFrame(
+        {
+            **result,
+            "volume": volume,
+            "avg_delivery_time": delivery_sum / volume,
+            "delay_percentage": late / volume * 100,
+        }
+    )
+
+
+def lane_performance(df_filtered_log):
+    return sparse_aggregate(df_filtered_log, ["seller_state", "customer_state"])
+
+
+def seller_performance(df_filtered_log, top_n=20, seller_state=None):
+    if seller_state is not None:
+        df_filtered_log = df_filtered_log[
+            df_filtered_log["seller_state"] == seller_state
+        ]
+    sellers = sparse_aggregate(
+        df_filtered_log, ["seller_id", "seller_state", "seller_city"]
+    )
+    return sellers.nlargest(top_n, "volume").reset_index(drop=True)
@@ -0,0 +1,289 @@
+import argparse
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pyarrow as pa
+import tornado.web
+from cachetools import LRUCache
+import aggregations as agg
+from data_export import iter_csv
+from data_loader import load_sales_data, load_logistics_data, load_forecast_data
+from forecasting import FORECAST_COLUMNS, fit_forecast
+
+# --- CONFIGURAÇÃO DO SERVIÇO ---
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+CACHE_SIZE = 256  # Resultados mantidos no cache compartilhado
+WORKERS = 4  # Threads que executam as agregações fora do event loop
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+EXECUTOR = ThreadPoolExecutor(max_workers=WORKERS)
+
+
+# --- CONJUNTOS DE DADOS (CARREGADOS UMA ÚNICA VEZ) ---
+_datasets = {}
+_datasets_lock = threading.Lock()
+LOADERS = {
+    "sales": load_sales_data,
+    "logistics": load_logistics_data,
+    "forecast": lambda: (agg.daily_revenue(load_forecast_data()), None),
+}
+
+
+def load_dataset(name):
+    # Retorna (df, lookups dos ids)
+    with _datasets_lock:
+        if name not in _datasets:
+            _datasets[name] = LOADERS[name]()
+        return _datasets[name]
+
+
+def get_dataset(name):
+    return load_dataset(name)[0]
+
+
+# --- CACHE COMPARTILHADO DE RESULTADOS ---
+class ResultCache:
+    # Só é acessado a partir do event loop; requisições idênticas simultâneas
+    # aguardam o mesmo cálculo em vez de dispará-lo novamente.
+    def __init__(self, maxsize=CACHE_SIZE):
+        self._results = LRUCache(maxsize=maxsize)
+        self._pending = {}
+
+    async def get(self, key, compute):
+        if key in self._results:
+            return self._results[key]
+        pending = self._pending.get(key)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(EXECUTOR, compute)
+            pending.add_done_callback(lambda future: self._finish(key, future))
+            self._pending[key] = pending
+        return await pending
+
+    def _finish(self, key, future):
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._results[key] = future.result()
+
+
+RESULT_CACHE = ResultCache()
+
+
+# --- ENDPOINTS ---
+def as_frame(result, value_name):
+    if isinstance(result, pd.Series):
+        return result.rename(value_name).reset_index()
+    return result
+
+
+ENDPOINTS = {
+    "sales": {
+        "kpis": lambda df: agg.sales_kpis(df),
+        "monthly": lambda df: agg.monthly_revenue(df),
+        "top-categories": lambda df: as_frame(agg.revenue_by_category(df), "price"),
+        "payments": lambda df: as_frame(agg.payment_distribution(df), "payment_value"),
+        "top-states": lambda df: as_frame(agg.revenue_by_state(df), "price"),
+    },
+    "logistics": {
+        "kpis": lambda df: agg.logistics_kpis(df),
+        "status": lambda df: as_frame(agg.delivery_status_counts(df), "count"),
+        "monthly": lambda df: agg.monthly_delivery_time(df),
+        "states": lambda df: agg.state_performance(df),
+        "lanes": lambda df: agg.lane_performance(df),
+    },
+}
+
+
+def filter_dataset(page, params):
+    df = get_dataset(page)
+    if page == "sales":
+        return agg.filter_sales(
+            df,
+            params["start"],
+            params["end"],
+            params["states"],
+            params["categories"],
+        )
+    return agg.filter_logistics(df, params["start"], params["end"], params["states"])
+
+
+def drop_unused_categories(df):
+    # As agregações agrupam com observed=False (o comportamento das páginas); aqui as
+    # categorias fora da seleção são removidas para que estados e categorias não
+    # filtrados não apareçam na resposta com valores nulos ou zerados.
+    categorical = df.select_dtypes("category").columns
+    return df.assign(
+        **{col: df[col].cat.remove_unused_categories() for col in categorical}
+    )
+
+
+def compute_endpoint(page, endpoint, params):
+    if endpoint == "lanes" and "seller_state" not in get_dataset(page).columns:
+        raise APIError(
+            404, "Rotas indisponíveis: execute o convert.py para gerar os vendedores"
+        )
+    df_filtered = filter_dataset(page, params)
+    if df_filtered.empty:
+        return None
+    return ENDPOINTS[page][endpoint](drop_unused_categories(df_filtered))
+
+
+def compute_forecast(months):
+    forecast = fit_forecast(get_dataset("forecast"), months)
+    return forecast[FORECAST_COLUMNS]
+
+
+# --- SERIALIZAÇÃO ---
+def to_json(result):
+    if result is None:
+        return json.dumps({"data": None})
+    if isinstance(result, dict):
+        return json.dumps({"data": result})
+    return '{"data": %s}' % result.to_json(
+        orient="split", index=False, date_format="iso"
+    )
+
+
+def to_arrow(result):
+    if result is None:
+        result = pd.DataFrame()
+    elif isinstance(result, dict):
+        result = pd.DataFrame([result])
+    table = pa.Table.from_pandas(result, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# --- HANDLERS ---
+class APIError(tornado.web.HTTPError):
+    # A mensagem vai no corpo JSON; a reason phrase do HTTP fica a padrão (ASCII),
+    # já que clientes decodificam a linha de status como latin-1.
+    def __init__(self, status_code, message):
+        super().__init__(status_code)
+        self.message = message
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def write_error(self, status_code, **kwargs):
+        error = kwargs.get("exc_info", (None, None))[1]
+        message = getattr(error, "message", None) or self._reason
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.finish(json.dumps({"error": message}, ensure_ascii=False))
+
+    def get_list(self, name):
+        value = self.get_query_argument(name, None)
+        if not value:
+            return None
+        return tuple(sorted(item.strip() for item in value.split(",") if item.strip()))
+
+    def get_date(self, name):
+        value = self.get_query_argument(name, None)
+        if not value:
+            return None
+        try:
+            return pd.Timestamp(value).normalize()
+        except ValueError:
+            raise APIError(400, f"Data inválida em '{name}'")
+
+    def get_filters(self, page):
+        end = self.get_date("end")
+        return {
+            "start": self.get_date("start"),
+            # A data final é inclusiva, como no filtro das páginas
+            "end": end + pd.Timedelta(days=1) if end is not None else None,
+            "states": self.get_list("states"),
+            "categories": self.get_list("categories") if page == "sales" else None,
+        }
+
+    def write_result(self, result):
+        if self.get_query_argument("format", "json") == "arrow":
+            self.set_header("Content-Type", ARROW_MIME)
+            self.write(to_arrow(result))
+        else:
+            self.set_header("Content-Type", "application/json")
+            self.write(to_json(result))
+
+
+class AggregationHandler(BaseHandler):
+    async def get(self, page, endpoint):
+        if endpoint not in ENDPOINTS[page]:
+            raise tornado.web.HTTPError(404)
+        params = self.get_filters(page)
+        key = (page, endpoint, tuple(params.items()))
+        result = await RESULT_CACHE.get(
+            key, lambda: compute_endpoint(page, endpoint, params)
+        )
+        self.write_result(result)
+
+
+class ExportHandler(BaseHandler):
+    # Envia a seleção filtrada como CSV em blocos: cada bloco é codificado em uma
+    # thread e enviado antes do próximo, então nem o arquivo inteiro nem uma cópia
+    # decodificada do frame ficam em memória no servidor.
+    async def get(self, page):
+        params = self.get_filters(page)
+        loop = asyncio.get_running_loop()
+        df_filtered = await loop.run_in_executor(
+            EXECUTOR, filter_dataset, page, params
+        )
+        lookups = load_dataset(page)[1]
+        self.set_header("Content-Type", "text/csv; charset=utf-8")
+        self.set_header(
+            "Content-Disposition", f'attachment; filename="{page}_dados_filtrados.csv"'
+        )
+        if df_filtered.empty:
+            self.write(df_filtered.to_csv(index=False))
+            return
+        blocks = iter_csv(df_filtered, lookups)
+        while True:
+            block = await loop.run_in_executor(EXECUTOR, next, blocks, None)
+            if block is None:
+                break
+            self.write(block)
+            await self.flush()
+
+
+class ForecastHandler(BaseHandler):
+    async def get(self):
+        try:
+            months = int(self.get_query_argument("months", "3"))
+        except ValueError:
+            raise APIError(400, "'months' deve ser inteiro")
+        if not 1 <= months <= 12:
+            raise APIError(400, "'months' deve estar entre 1 e 12")
+        result = await RESULT_CACHE.get(
+            ("forecast", months), lambda: compute_forecast(months)
+        )
+        self.write_result(result)
+
+
+def make_app():
+    return tornado.web.Application(
+        [
+            (r"/api/(sales|logistics)/export", ExportHandler),
+            (r"/api/(sales|logistics)/([a-z-]+)", AggregationHandler),
+            (r"/api/forecast", ForecastHandler),
+        ]
+    )
+
+
+async def main(host, port):
+    app = make_app()
+    app.listen(port, address=host)
+    print(f"API de agregações disponível em http://{host}:{port}/api/")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serviço HTTP com os KPIs e séries do dashboard."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port))
@@ -11,6 +11,7 @@ files_to_convert = [
     'olist_order_items_dataset.csv',
     'olist_order_payments_dataset.csv',
     'olist_products_dataset.csv',
+    'olist_sellers_dataset.csv',
     'product_category_name_translation.csv'
 ]
 
@@ -0,0 +1,112 @@
+import io
+import json
+import unicodedata
+from data_loader import decode_ids
+
+# --- CONFIGURAÇÃO DA EXPORTAÇÃO ---
+CHUNK_SIZE = 50_000  # Linhas por bloco (e por row group no Parquet)
+EXCEL_MAX_ROWS = 1_048_576  # Limite de linhas de uma planilha do Excel
+METADATA_KEY = b"dashboard_filters"
+
+
+# --- GERAÇÃO EM BLOCOS ---
+def iter_chunks(df, lookups=None, chunk_size=CHUNK_SIZE):
+    # Percorre o DataFrame em fatias, decodificando os ids apenas do bloco atual,
+    # para que a exportação nunca mantenha uma segunda cópia completa do frame.
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start : start + chunk_size]
+        if lookups:
+            chunk = decode_ids(chunk, lookups)
+        yield chunk
+
+
+def iter_csv(df, lookups=None, chunk_size=CHUNK_SIZE):
+    for i, chunk in enumerate(iter_chunks(df, lookups, chunk_size)):
+        yield chunk.to_csv(index=False, header=(i == 0)).encode("utf-8")
+
+
+# --- ESCRITORES POR FORMATO ---
+# openpyxl e pyarrow.parquet são importados apenas quando o formato é pedido
+def write_csv(df, buffer, lookups=None, metadata=None):
+    if df.empty:
+        buffer.write(df.to_csv(index=False).encode("utf-8"))
+    for block in iter_csv(df, lookups):
+        buffer.write(block)
+
+
+def parquet_schema(df, lookups=None, metadata=None):
+    import pyarrow as pa
+
+    # O schema vem dos dtypes do frame inteiro, não do primeiro bloco: uma coluna
+    # toda nula em um bloco (ex: seller_city) seria inferida como tipo null.
+    schema = pa.Schema.from_pandas(df.head(0), preserve_index=False)
+    for i, field in enumerate(schema):
+        if field.name in (lookups or {}) or pa.types.is_null(field.type):
+            # Ids saem decodificados como texto; colunas object vazias também
+            schema = schema.set(i, pa.field(field.name, pa.string()))
+    if metadata:
+        schema = schema.with_metadata(
+            {
+                **(schema.metadata or {}),
+                METADATA_KEY: json.dumps(metadata, default=str),
+            }
+        )
+    return schema
+
+
+def write_parquet(df, buffer, lookups=None, metadata=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(df, lookups, metadata)
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for chunk in iter_chunks(df, lookups):
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            writer.write_table(table, row_group_size=CHUNK_SIZE)
+
+
+def write_excel(df, buffer, lookups=None, metadata=None):
+    import openpyxl
+
+    if len(df) >= EXCEL_MAX_ROWS:
+        raise ValueError(
+            f"O Excel suporta no máximo {EXCEL_MAX_ROWS - 1:,} linhas; "
+            "use CSV ou Parquet para esta seleção."
+        )
+    workbook = openpyxl.Workbook(write_only=True)
+    if metadata:
+        workbook.properties.description = json.dumps(metadata, default=str)
+    sheet = workbook.create_sheet("dados")
+    sheet.append([str(col) for col in df.columns])
+    for chunk in iter_chunks(df, lookups):
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(buffer)
+
+
+EXPORT_FORMATS = {
+    "CSV": (write_csv, "csv", "text/csv"),
+    "Parquet": (write_parquet, "parquet", "application/octet-stream"),
+    "Excel": (
+        write_excel,
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+}
+
+
+def export_dataframe(df, export_format, lookups=None, metadata=None):
+    writer, extension, mime = EXPORT_FORMATS[export_format]
+    buffer = io.BytesIO()
+    writer(df, buffer, lookups=lookups, metadata=metadata)
+    buffer.seek(0)
+    return buffer, extension, mime
+
+
+def export_file_name(name, extension):
+    ascii_name = (
+        unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    )
+    slug = "_".join(ascii_name.lower().split())
+    return f"{slug}.{extension}"
@@ -0,0 +1,202 @@
+import os
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURAÇÃO DE LEITURA ---
+DATA_PATH = os.environ.get("DASHBOARD_DATA_PATH", "data/")
+# Modo de dtypes para as colunas de texto: "" mantém o fastparquet com colunas object,
+# "pyarrow" lê com o engine do PyArrow e mantém as strings em memória Arrow.
+DTYPE_BACKEND = os.environ.get("DASHBOARD_DTYPE_BACKEND", "")
+# Identificadores hexadecimais de 32 caracteres do dataset da Olist
+ID_COLUMNS = [
+    "order_id",
+    "customer_id",
+    "customer_unique_id",
+    "product_id",
+    "seller_id",
+]
+# Tabela opcional: dados convertidos antes de ela entrar no convert.py não a têm
+SELLERS_FILE = "olist_sellers_dataset.parquet"
+
+
+# --- LEITURA DAS TABELAS ---
+def read_table(file_name, columns=None, dtype_backend=None):
+    path = os.path.join(DATA_PATH, file_name)
+    backend = DTYPE_BACKEND if dtype_backend is None else dtype_backend
+    if backend == "pyarrow":
+        return pd.read_parquet(
+            path, columns=columns, engine="pyarrow", dtype_backend="pyarrow"
+        )
+    return pd.read_parquet(path, columns=columns, engine="fastparquet")
+
+
+# --- CODIFICAÇÃO DOS IDENTIFICADORES ---
+def encode_ids(frames, id_columns=ID_COLUMNS):
+    # Substitui cada coluna de id por chaves substitutas int32 densas. O dicionário é
+    # construído sobre todas as tabelas de uma vez, então o mesmo id recebe o mesmo
+    # código em todas elas e os merges passam a ser feitos sobre inteiros.
+    lookups = {}
+    for col in id_columns:
+        present = [frame for frame in frames if col in frame.columns]
+        if not present:
+            continue
+        values = pd.concat([frame[col] for frame in present], ignore_index=True)
+        codes, uniques = pd.factorize(values)
+        codes = codes.astype("int32")
+        offset = 0
+        for frame in present:
+            size = len(frame)
+            frame[col] = codes[offset : offset + size]
+            offset += size
+        lookups[col] = pd.Index(uniques, name=col)
+    return lookups
+
+
+def decode_ids(df, lookups):
+    # Converte as chaves int32 de volta para os ids originais (ex: para exibição/exportação)
+    df = df.copy()
+    for col, lookup in lookups.items():
+        if col in df.columns:
+            codes = df[col].to_numpy()
+            decoded = lookup.take(np.where(codes < 0, 0, codes))
+            decoded = decoded.to_numpy(dtype=object)
+            decoded[codes < 0] = None
+            df[col] = decoded
+    return df
+
+
+# --- CONJUNTOS DE DADOS DAS PÁGINAS ---
+def load_sales_data():
+    cols_orders = ["order_id", "customer_id", "order_purchase_timestamp"]
+    cols_items = ["order_id", "product_id", "price"]
+    cols_payments = ["order_id", "payment_type", "payment_value"]
+    cols_customers = ["customer_id", "customer_unique_id", "customer_state"]
+    cols_products = ["product_id", "product_category_name"]
+    cols_translation = ["product_category_name", "product_category_name_english"]
+
+    orders = read_table("olist_orders_dataset.parquet", cols_orders)
+    items = read_table("olist_order_items_dataset.parquet", cols_items)
+    payments = read_table("olist_order_payments_dataset.parquet", cols_payments)
+    customers = read_table("olist_customers_dataset.parquet", cols_customers)
+    products = read_table("olist_products_dataset.parquet", cols_products)
+    translation = read_table(
+        "product_category_name_translation.parquet", cols_translation
+    )
+
+    # Ids hexadecimais viram chaves int32 antes dos merges
+    id_lookups = encode_ids([orders, items, payments, customers, products])
+
+    df = (
+        orders.merge(items, on="order_id")
+        .merge(payments, on="order_id")
+        .merge(customers, on="customer_id")
+        .merge(products, on="product_id")
+        .merge(translation, on="product_category_name", how="left")
+    )
+
+    df["order_purchase_timestamp"] = pd.to_datetime(
+        df["order_purchase_timestamp"], errors="coerce"
+    )
+    df.dropna(subset=["order_purchase_timestamp"], inplace=True)
+    df["customer_state"] = df["customer_state"].astype("category")
+    df["payment_type"] = df["payment_type"].astype("category")
+    df["product_category_name_english"] = (
+        df["product_category_name_english"].fillna("unknown").astype("category")
+    )
+    df["price"] = df["price"].astype("float32")
+    df["payment_value"] = df["payment_value"].astype("float32")
+
+    return df, id_lookups
+
+
+def load_category_translation():
+    translation_df = read_table("product_category_name_translation.parquet")
+    category_translation_raw = pd.Series(
+        translation_df.product_category_name.values,
+        index=translation_df.product_category_name_english,
+    ).to_dict()
+    category_translation = {
+        en: pt.replace("_", " ").title() for en, pt in category_translation_raw.items()
+    }
+    category_translation["unknown"] = "Desconhecida"
+    return category_translation
+
+
+def load_logistics_data():
+    cols_orders = [
+        "order_id",
+        "customer_id",
+        "order_purchase_timestamp",
+        "order_delivered_customer_date",
+        "order_estimated_delivery_date",
+    ]
+    cols_items = ["order_id", "seller_id", "price"]
+    cols_customers = ["customer_id", "customer_unique_id", "customer_state"]
+    cols_sellers = ["seller_id", "seller_city", "seller_state"]
+
+    orders = read_table("olist_orders_dataset.parquet", cols_orders)
+    items = read_table("olist_order_items_dataset.parquet", cols_items)
+    customers = read_table("olist_customers_dataset.parquet", cols_customers)
+    tables = [orders, items, customers]
+    # Sem a tabela de vendedores, o frame sai sem seller_city/seller_state e as
+    # análises de rotas ficam indisponíveis
+    has_sellers = os.path.exists(os.path.join(DATA_PATH, SELLERS_FILE))
+    if has_sellers:
+        sellers = read_table(SELLERS_FILE, cols_sellers)
+        tables.append(sellers)
+
+    # Ids hexadecimais viram chaves int32 antes dos merges
+    id_lookups = encode_ids(tables)
+
+    df = orders.merge(customers, on="customer_id").merge(items, on="order_id")
+    if has_sellers:
+        df = df.merge(sellers, on="seller_id", how="left")
+    for col in [
+        "order_purchase_timestamp",
+        "order_delivered_customer_date",
+        "order_estimated_delivery_date",
+    ]:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    df.dropna(
+        subset=[
+            "order_purchase_timestamp",
+            "order_delivered_customer_date",
+            "order_estimated_delivery_date",
+        ],
+        inplace=True,
+    )
+    df["customer_state"] = df["customer_state"].astype("category")
+    if has_sellers:
+        df["seller_state"] = df["seller_state"].astype("category")
+        df["seller_city"] = df["seller_city"].astype("category")
+    return process_logistics_data(df), id_lookups
+
+
+def process_logistics_data(df):
+    df["delivery_time"] = (
+        df["order_delivered_customer_date"] - df["order_purchase_timestamp"]
+    ).dt.days
+    df["estimated_time"] = (
+        df["order_estimated_delivery_date"] - df["order_purchase_timestamp"]
+    ).dt.days
+    df["delivery_delay"] = (
+        df["order_delivered_customer_date"] - df["order_estimated_delivery_date"]
+    ).dt.days
+    df = df[df["delivery_time"] >= 0].copy()
+    df["delivery_status"] = pd.Categorical(
+        np.where(df["delivery_delay"] > 0, "Atrasado", "No Prazo")
+    )
+    return df
+
+
+def load_forecast_data():
+    cols_orders = ["order_id", "order_purchase_timestamp"]
+    cols_items = ["order_id", "price"]
+
+    orders = read_table("olist_orders_dataset.parquet", cols_orders)
+    items = read_table("olist_order_items_dataset.parquet", cols_items)
+
+    encode_ids([orders, items])
+    df = orders.merge(items, on="order_id")
+    df["order_purchase_timestamp"] = pd.to_datetime(df["order_purchase_timestamp"])
+    return df
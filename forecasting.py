@@ -0,0 +1,23 @@
+FORECAST_COLUMNS = [
+    "ds",
+    "yhat",
+    "yhat_lower",
+    "yhat_upper",
+    "trend",
+    "yearly",
+    "weekly",
+]
+
+
+# --- TREINAMENTO E PREVISÃO ---
+def fit_forecast(df_prophet, prediction_period):
+    # prediction_period em meses, aproximados como blocos de 30 dias. O Prophet (e
+    # com ele cmdstanpy, matplotlib e holidays) só é importado quando há previsão.
+    from prophet import Prophet
+
+    model = Prophet(
+        yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False
+    )
+    model.fit(df_prophet)
+    future = model.make_future_dataframe(periods=prediction_period * 30)
+    return model.predict(future)
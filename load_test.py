@@ -0,0 +1,376 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import numpy as np
+import tornado.websocket
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+# --- CONFIGURAÇÃO DO TESTE DE CARGA ---
+# Nome de cada página na URL do app multipáginas
+PAGES = {
+    "vendas": "Vendas",
+    "logistica": "Logistica",
+    "previsao": "Previsao",
+}
+PERCENTILES = [50, 95, 99]
+WIDGET_TYPES = ["date_input", "multiselect", "radio", "selectbox", "slider", "button"]
+DEFAULT_PORT = 8599
+DATE_FORMAT = "%Y/%m/%d"  # Formato das datas no protocolo do Streamlit
+
+
+# --- SERVIDOR ---
+def start_server(port, data_path):
+    # Um único `streamlit run`, como em produção: todas as sessões simuladas
+    # disputam o mesmo processo, os mesmos caches e o mesmo event loop.
+    env = {**os.environ, "DASHBOARD_DATA_PATH": data_path}
+    command = [
+        sys.executable,
+        "-m",
+        "streamlit",
+        "run",
+        "app.py",
+        "--server.headless=true",
+        f"--server.port={port}",
+        "--server.fileWatcherType=none",
+        "--browser.gatherUsageStats=false",
+    ]
+    return subprocess.Popen(
+        command,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_healthy(server, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("O servidor do Streamlit terminou antes de iniciar.")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health"):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError("O servidor do Streamlit não respondeu ao health check.")
+
+
+def server_memory_mb(pid):
+    # (RSS atual, pico de RSS) do processo do servidor; só disponível no Linux
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    memory[key] = int(value.split()[0]) / 1024
+    except OSError:
+        return None, None
+    return memory.get("VmRSS"), memory.get("VmHWM")
+
+
+# --- SESSÃO SIMULADA (CLIENTE WEBSOCKET) ---
+class SimulatedSession:
+    # Fala o mesmo protocolo do navegador: envia um BackMsg de rerun com o estado
+    # dos widgets e lê os ForwardMsg até o fim da execução do script.
+    def __init__(self, port, page, timeout):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.page = page
+        self.timeout = timeout
+        self.widgets = {}
+        self.widget_states = {}
+        self.connection = None
+
+    async def connect(self):
+        self.connection = await tornado.websocket.websocket_connect(
+            self.url, max_message_size=512 * 1024 * 1024
+        )
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    def widget(self, widget_type, position=0, key=None):
+        candidates = self.widgets.get(widget_type, [])
+        if key is not None:
+            candidates = [w for w in candidates if w.id.endswith(f"-{key}")]
+            position = 0
+        return candidates[position]
+
+    def set_state(self, widget, field, value):
+        state = WidgetState(id=widget.id)
+        if isinstance(value, list):
+            getattr(state, field).data.extend(value)
+        else:
+            setattr(state, field, value)
+        self.widget_states[widget.id] = state
+
+    async def rerun(self):
+        message = BackMsg()
+        message.rerun_script.page_name = PAGES[self.page]
+        message.rerun_script.widget_states.widgets.extend(self.widget_states.values())
+
+        started = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        widgets, errors = {}, []
+        while True:
+            payload = await asyncio.wait_for(
+                self.connection.read_message(), self.timeout
+            )
+            if payload is None:
+                raise ConnectionError("O servidor fechou a conexão websocket.")
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+            if kind == "script_finished":
+                break
+            if kind != "delta" or forward.delta.WhichOneof("type") != "new_element":
+                continue
+            element = forward.delta.new_element
+            element_type = element.WhichOneof("type")
+            if element_type == "exception":
+                errors.append(element.exception.message)
+            elif element_type in WIDGET_TYPES:
+                widgets.setdefault(element_type, []).append(
+                    getattr(element, element_type)
+                )
+        latency = time.perf_counter() - started
+
+        self.widgets = widgets
+        # Cliques de botão valem apenas para um rerun, como no navegador
+        self.widget_states = {
+            widget_id: state
+            for widget_id, state in self.widget_states.items()
+            if state.WhichOneof("value") != "trigger_value"
+        }
+        return latency, errors
+
+
+# --- ROTEIROS DE INTERAÇÃO ---
+def pick_date_range(rng, session, widget):
+    min_date = datetime.datetime.strptime(widget.min, DATE_FORMAT).date()
+    max_date = datetime.datetime.strptime(widget.max, DATE_FORMAT).date()
+    span = (max_date - min_date).days
+    start = rng.randint(0, max(span - 30, 0))
+    end = rng.randint(start, span)
+    dates = [min_date + datetime.timedelta(days=d) for d in (start, end)]
+    session.set_state(
+        widget, "string_array_value", [d.strftime(DATE_FORMAT) for d in dates]
+    )
+
+
+def pick_subset(rng, session, widget):
+    options = list(widget.options)
+    subset = rng.sample(options, rng.randint(1, len(options)))
+    session.set_state(widget, "string_array_value", subset)
+
+
+def sales_steps(session, rng):
+    return [
+        lambda: pick_date_range(rng, session, session.widget("date_input")),
+        lambda: pick_subset(rng, session, session.widget("multiselect", 0)),
+        lambda: pick_subset(rng, session, session.widget("multiselect", 1)),
+    ]
+
+
+def logistics_steps(session, rng):
+    return [
+        lambda: pick_date_range(
+            rng, session, session.widget("date_input", key="logistics_date_range")
+        ),
+        lambda: pick_subset(
+            rng, session, session.widget("multiselect", key="logistics_states")
+        ),
+    ]
+
+
+def forecast_steps(session, rng):
+    def run_forecast():
+        slider = session.widget("slider", key="prediction_period")
+        session.set_state(slider, "double_array_value", [float(rng.randint(1, 12))])
+        session.set_state(session.widget("button"), "trigger_value", True)
+
+    return [run_forecast]
+
+
+SCENARIOS = {
+    "vendas": sales_steps,
+    "logistica": logistics_steps,
+    "previsao": forecast_steps,
+}
+
+
+async def run_session(port, page, iterations, seed, timeout):
+    rng = random.Random(seed)
+    session = SimulatedSession(port, page, timeout)
+    await session.connect()
+    latencies, errors = [], []
+    try:
+        cold_start, cold_errors = await session.rerun()
+        errors.extend(cold_errors)
+        steps = SCENARIOS[page](session, rng)
+        for _ in range(iterations):
+            for step in steps:
+                step()
+                latency, step_errors = await session.rerun()
+                latencies.append(latency)
+                errors.extend(step_errors)
+    finally:
+        session.close()
+    return {
+        "page": page,
+        "cold_start": cold_start,
+        "latencies": latencies,
+        "errors": errors,
+    }
+
+
+async def run_sessions(port, sessions, timeout):
+    return await asyncio.gather(
+        *(
+            run_session(port, page, iterations, seed, timeout)
+            for page, iterations, seed in sessions
+        )
+    )
+
+
+# --- RELATÓRIO ---
+def summarize(latencies, wall_time):
+    latencies = np.asarray(latencies) * 1000
+    summary = {"reruns": int(latencies.size)}
+    if latencies.size:
+        for p in PERCENTILES:
+            summary[f"p{p}_ms"] = float(np.percentile(latencies, p))
+    summary["throughput_rps"] = latencies.size / wall_time if wall_time else 0.0
+    return summary
+
+
+def build_report(results, wall_time, memory, args):
+    report = {
+        "sessions": args.sessions,
+        "iterations": args.iterations,
+        "orders": args.orders,
+        "wall_time_s": wall_time,
+        "overall": summarize(
+            [lat for r in results for lat in r["latencies"]], wall_time
+        ),
+        "pages": {},
+        "server": memory,
+        "errors": sum(len(r["errors"]) for r in results),
+    }
+    for page in sorted({r["page"] for r in results}):
+        page_results = [r for r in results if r["page"] == page]
+        summary = summarize(
+            [lat for r in page_results for lat in r["latencies"]], wall_time
+        )
+        summary["cold_start_ms"] = float(
+            np.mean([r["cold_start"] for r in page_results]) * 1000
+        )
+        report["pages"][page] = summary
+    return report
+
+
+def print_report(report):
+    print(
+        f"\n{report['sessions']} sessões x {report['iterations']} iterações "
+        f"em {report['wall_time_s']:.1f}s contra um único servidor "
+        f"({report['orders']:,} pedidos sintéticos)"
+    )
+    header = f"{'página':<12}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    header += f"{'rerun/s':>10}{'frio ms':>10}"
+    print(header)
+    for page, summary in report["pages"].items():
+        print(
+            f"{page:<12}{summary['reruns']:>8}"
+            f"{summary.get('p50_ms', 0):>10.0f}{summary.get('p95_ms', 0):>10.0f}"
+            f"{summary.get('p99_ms', 0):>10.0f}{summary['throughput_rps']:>10.1f}"
+            f"{summary['cold_start_ms']:>10.0f}"
+        )
+    overall = report["overall"]
+    print(
+        f"{'total':<12}{overall['reruns']:>8}"
+        f"{overall.get('p50_ms', 0):>10.0f}{overall.get('p95_ms', 0):>10.0f}"
+        f"{overall.get('p99_ms', 0):>10.0f}{overall['throughput_rps']:>10.1f}"
+    )
+    server = report["server"]
+    if server["peak_rss_mb"] is not None:
+        print(
+            f"\nServidor: RSS {server['idle_rss_mb']:.0f} MB ocioso, "
+            f"{server['final_rss_mb']:.0f} MB ao final, "
+            f"pico de {server['peak_rss_mb']:.0f} MB "
+            f"(~{server['rss_per_session_mb']:.1f} MB por sessão)"
+        )
+    if report["errors"]:
+        print(f"\nAVISO: {report['errors']} reruns terminaram com exceção.")
+
+
+# --- EXECUÇÃO ---
+def main():
+    parser = argparse.ArgumentParser(
+        description="Teste de carga com sessões simultâneas em um único servidor."
+    )
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument(
+        "--pages", nargs="+", choices=list(PAGES), default=["vendas", "logistica"]
+    )
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--output", help="Arquivo JSON para salvar o relatório")
+    args = parser.parse_args()
+
+    from synthetic_data import write_synthetic_data
+
+    with tempfile.TemporaryDirectory() as data_path:
+        print(f"Gerando {args.orders:,} pedidos sintéticos em {data_path}...")
+        write_synthetic_data(data_path, n_orders=args.orders, seed=args.seed)
+
+        server = start_server(args.port, data_path)
+        try:
+            wait_until_healthy(server, args.port, args.timeout)
+            idle_rss, _ = server_memory_mb(server.pid)
+            sessions = [
+                (args.pages[i % len(args.pages)], args.iterations, args.seed + i)
+                for i in range(args.sessions)
+            ]
+            started = time.perf_counter()
+            results = asyncio.run(run_sessions(args.port, sessions, args.timeout))
+            wall_time = time.perf_counter() - started
+            final_rss, peak_rss = server_memory_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+    memory = {
+        "idle_rss_mb": idle_rss,
+        "final_rss_mb": final_rss,
+        "peak_rss_mb": peak_rss,
+        # Inclui os caches carregados pela primeira sessão de cada página
+        "rss_per_session_mb": (
+            (final_rss - idle_rss) / args.sessions if final_rss is not None else None
+        ),
+    }
+    report = build_report(results, wall_time, memory, args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRelatório salvo em '{args.output}'.")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,23 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import os
+from aggregations import (
+    filter_sales,
+    sales_kpis,
+    monthly_revenue,
+    revenue_by_category,
+    payment_distribution,
+    revenue_by_state,
+)
+from data_loader import load_sales_data, load_category_translation
+from prefix_index import (
+    COMPARISONS,
+    build_sales_index,
+    select_cells,
+    comparison_period,
+    compare_periods,
+    percent_delta,
+)
+from data_export import EXPORT_FORMATS, export_dataframe, export_file_name
 from style_config import CSS, PRIMARY_COLOR, COLOR_SEQUENCE, SEQUENTIAL_COLOR_SCALE
 
 # --- CONFIGURAÇÃO DA PÁGINA E CSS ---
@@ -13,87 +29,25 @@ st.markdown(CSS, unsafe_allow_html=True)
 # --- CARREGAMENTO DOS DADOS ---
 @st.cache_data
 def load_data():
-    data_path = "data/"
     try:
-        cols_orders = ["order_id", "customer_id", "order_purchase_timestamp"]
-        cols_items = ["order_id", "product_id", "price"]
-        cols_payments = ["order_id", "payment_type", "payment_value"]
-        cols_customers = ["customer_id", "customer_unique_id", "customer_state"]
-        cols_products = ["product_id", "product_category_name"]
-        cols_translation = ["product_category_name", "product_category_name_english"]
-
-        orders = pd.read_parquet(
-            os.path.join(data_path, "olist_orders_dataset.parquet"),
-            columns=cols_orders,
-            engine="fastparquet",
-        )
-        items = pd.read_parquet(
-            os.path.join(data_path, "olist_order_items_dataset.parquet"),
-            columns=cols_items,
-            engine="fastparquet",
-        )
-        payments = pd.read_parquet(
-            os.path.join(data_path, "olist_order_payments_dataset.parquet"),
-            columns=cols_payments,
-            engine="fastparquet",
-        )
-        customers = pd.read_parquet(
-            os.path.join(data_path, "olist_customers_dataset.parquet"),
-            columns=cols_customers,
-            engine="fastparquet",
-        )
-        products = pd.read_parquet(
-            os.path.join(data_path, "olist_products_dataset.parquet"),
-            columns=cols_products,
-            engine="fastparquet",
-        )
-        translation = pd.read_parquet(
-            os.path.join(data_path, "product_category_name_translation.parquet"),
-            columns=cols_translation,
-            engine="fastparquet",
-        )
-
+        df, id_lookups = load_sales_data()
+        category_translation = load_category_translation()
     except Exception as e:
         st.error(f"Erro ao ler os arquivos Parquet. Detalhe: {e}")
         st.stop()
+    return df, id_lookups, category_translation, build_sales_index(df)
 
-    df = (
-        orders.merge(items, on="order_id")
-        .merge(payments, on="order_id")
-        .merge(customers, on="customer_id")
-        .merge(products, on="product_id")
-        .merge(translation, on="product_category_name", how="left")
-    )
-
-    df["order_purchase_timestamp"] = pd.to_datetime(
-        df["order_purchase_timestamp"], errors="coerce"
-    )
-    df.dropna(subset=["order_purchase_timestamp"], inplace=True)
-    df["customer_state"] = df["customer_state"].astype("category")
-    df["payment_type"] = df["payment_type"].astype("category")
-    df["product_category_name_english"] = (
-        df["product_category_name_english"].fillna("unknown").astype("category")
-    )
-    df["price"] = df["price"].astype("float32")
-    df["payment_value"] = df["payment_value"].astype("float32")
 
-    return df
+@st.cache_data(max_entries=64)
+def comparison_kpis(_df, start_date, end_date, states, categories):
+    # Pedidos e clientes distintos do período de comparação exigem filtrar as linhas
+    # (custo proporcional ao histórico); o resultado fica em cache por período e
+    # filtros, então só é recalculado quando eles mudam
+    return sales_kpis(filter_sales(_df, start_date, end_date, states, categories))
 
 
 # --- LÓGICA PRINCIPAL E DICIONÁRIOS ---
-df = load_data()
-translation_df = pd.read_parquet(
-    os.path.join("data", "product_category_name_translation.parquet"),
-    engine="fastparquet",
-)
-category_translation_raw = pd.Series(
-    translation_df.product_category_name.values,
-    index=translation_df.product_category_name_english,
-).to_dict()
-category_translation = {
-    en: pt.replace("_", " ").title() for en, pt in category_translation_raw.items()
-}
-category_translation["unknown"] = "Desconhecida"
+df, id_lookups, category_translation, sales_index = load_data()
 payment_type_translation = {
     "credit_card": "Cartão de Crédito",
     "boleto": "Boleto",
@@ -122,44 +76,99 @@ categories_pt = sorted(
 selected_categories_pt = st.sidebar.multiselect(
     "Categoria:", options=categories_pt, default=categories_pt
 )
+comparison = st.sidebar.radio(
+    "Comparar com:", options=list(COMPARISONS), key="sales_comparison"
+)
 
 # --- FILTRAGEM DO DATAFRAME ---
 category_translation_rev = {v: k for k, v in category_translation.items()}
 selected_categories_en = [
     category_translation_rev.get(cat, cat) for cat in (selected_categories_pt or [])
 ]
-query = "customer_state in @selected_states and product_category_name_english in @selected_categories_en and order_purchase_timestamp >= @start_date and order_purchase_timestamp < @end_date"
-df_filtered = df.query(query)
+df_filtered = filter_sales(
+    df, start_date, end_date, selected_states, selected_categories_en
+)
 
 # --- LAYOUT DO DASHBOARD ---
 if not df_filtered.empty:
-    total_revenue = df_filtered["price"].sum()
-    total_orders = df_filtered["order_id"].nunique()
-    average_ticket = total_revenue / total_orders if total_orders > 0 else 0
-    unique_customers = df_filtered["customer_unique_id"].nunique()
+    # A receita e sua variação vêm do índice de somas acumuladas; pedidos e clientes
+    # distintos não são somáveis entre dias e células, então saem das linhas
+    # filtradas (do período atual e do período de comparação).
+    kpis = sales_kpis(df_filtered)
+    sales_cells = select_cells(
+        sales_index,
+        {
+            "customer_state": selected_states,
+            "product_category_name_english": selected_categories_en,
+        },
+    )
+    current, previous = compare_periods(
+        sales_index, start_date, end_date, sales_cells, COMPARISONS[comparison]
+    )
+    total_revenue = current["revenue"]
+    average_ticket = (
+        total_revenue / kpis["total_orders"] if kpis["total_orders"] > 0 else 0
+    )
+    # Sem histórico completo para o período de comparação, os KPIs ficam sem delta
+    deltas = {}
+    if previous is not None:
+        previous_start, previous_end = comparison_period(
+            start_date, end_date, COMPARISONS[comparison]
+        )
+        previous_kpis = comparison_kpis(
+            df,
+            previous_start,
+            previous_end,
+            tuple(selected_states),
+            tuple(selected_categories_en),
+        )
+        deltas = {
+            "revenue": percent_delta(current["revenue"], previous["revenue"]),
+            "orders": percent_delta(
+                kpis["total_orders"], previous_kpis["total_orders"]
+            ),
+            "ticket": percent_delta(average_ticket, previous_kpis["average_ticket"]),
+            "customers": percent_delta(
+                kpis["unique_customers"], previous_kpis["unique_customers"]
+            ),
+        }
 
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
-    kpi1.metric(label="Receita Total", value=f"R$ {total_revenue:,.0f}")
-    kpi2.metric(label="Pedidos Totais", value=f"{total_orders:,}")
-    kpi3.metric(label="Ticket Médio", value=f"R$ {average_ticket:,.2f}")
-    kpi4.metric(label="Clientes Únicos", value=f"{unique_customers:,}")
+    kpi1.metric(
+        label="Receita Total",
+        value=f"R$ {total_revenue:,.0f}",
+        delta=deltas.get("revenue"),
+    )
+    kpi2.metric(
+        label="Pedidos Totais",
+        value=f"{kpis['total_orders']:,}",
+        delta=deltas.get("orders"),
+    )
+    kpi3.metric(
+        label="Ticket Médio",
+        value=f"R$ {average_ticket:,.2f}",
+        delta=deltas.get("ticket"),
+    )
+    kpi4.metric(
+        label="Clientes Únicos",
+        value=f"{kpis['unique_customers']:,}",
+        delta=deltas.get("customers"),
+    )
 
     st.markdown("---")
 
+    # O plotly.express só é importado depois dos KPIs, quando há gráficos
+    import plotly.express as px
+
     col1, col2 = st.columns([3, 2])
     with col1:
         st.markdown(
             '<p class="chart-title">Tendência Mensal de Receita</p>',
             unsafe_allow_html=True,
         )
-        monthly_revenue = (
-            df_filtered.set_index("order_purchase_timestamp")
-            .resample("ME")["price"]
-            .sum()
-            .reset_index()
-        )
+        revenue_monthly = monthly_revenue(df_filtered)
         fig_monthly = px.area(
-            monthly_revenue,
+            revenue_monthly,
             x="order_purchase_timestamp",
             y="price",
             color_discrete_sequence=[PRIMARY_COLOR],
@@ -175,19 +184,12 @@ if not df_filtered.empty:
             '<p class="chart-title">Top 10 Categorias por Receita</p>',
             unsafe_allow_html=True,
         )
-        revenue_by_category = (
-            df_filtered.groupby("product_category_name_english", observed=False)[
-                "price"
-            ]
-            .sum()
-            .nlargest(10)
-            .sort_values()
-        )
-        revenue_by_category.index = revenue_by_category.index.map(category_translation)
+        revenue_category = revenue_by_category(df_filtered)
+        revenue_category.index = revenue_category.index.map(category_translation)
         fig_cat = px.bar(
-            revenue_by_category,
+            revenue_category,
             x="price",
-            y=revenue_by_category.index,
+            y=revenue_category.index,
             orientation="h",
             text_auto=".2s",
             color_discrete_sequence=[PRIMARY_COLOR],
@@ -203,15 +205,11 @@ if not df_filtered.empty:
         st.markdown(
             '<p class="chart-title">Métodos de Pagamento</p>', unsafe_allow_html=True
         )
-        payment_distribution = df_filtered.groupby("payment_type", observed=False)[
-            "payment_value"
-        ].sum()
-        payment_distribution.index = payment_distribution.index.map(
-            payment_type_translation
-        )
+        payments = payment_distribution(df_filtered)
+        payments.index = payments.index.map(payment_type_translation)
         fig_payment = px.pie(
-            payment_distribution,
-            names=payment_distribution.index,
+            payments,
+            names=payments.index,
             values="payment_value",
             hole=0.5,
             color_discrete_sequence=COLOR_SEQUENCE,
@@ -228,15 +226,10 @@ if not df_filtered.empty:
             '<p class="chart-title">Top 10 Estados por Receita</p>',
             unsafe_allow_html=True,
         )
-        revenue_by_state = (
-            df_filtered.groupby("customer_state", observed=False)["price"]
-            .sum()
-            .nlargest(10)
-            .sort_values(ascending=False)
-        )
+        revenue_state = revenue_by_state(df_filtered)
         fig_state = px.bar(
-            revenue_by_state,
-            x=revenue_by_state.index,
+            revenue_state,
+            x=revenue_state.index,
             y="price",
             text_auto=".2s",
             color="price",
@@ -247,5 +240,46 @@ if not df_filtered.empty:
             margin=dict(l=10, r=10, t=20, b=20), yaxis_title=None, xaxis_title=None
         )
         st.plotly_chart(fig_state, use_container_width=True)
+
+    # --- EXPORTAÇÃO DOS DADOS ---
+    st.sidebar.markdown("---")
+    st.sidebar.header("Exportar")
+    export_datasets = {
+        "Dados Filtrados": df_filtered,
+        "Receita Mensal": revenue_monthly,
+        "Top 10 Categorias": revenue_category.reset_index(),
+        "Métodos de Pagamento": payments.reset_index(),
+        "Top 10 Estados": revenue_state.reset_index(),
+    }
+    export_filters = {
+        "start_date": start_date.date(),
+        "end_date": (end_date - pd.Timedelta(days=1)).date(),
+        "states": selected_states,
+        "categories": selected_categories_en,
+    }
+    export_name = st.sidebar.selectbox(
+        "Conjunto:", options=list(export_datasets), key="sales_export_dataset"
+    )
+    export_format = st.sidebar.selectbox(
+        "Formato:", options=list(EXPORT_FORMATS), key="sales_export_format"
+    )
+    if st.sidebar.button("Preparar Arquivo", key="sales_export_prepare"):
+        try:
+            with st.spinner("Gerando o arquivo de exportação..."):
+                export_buffer, extension, mime = export_dataframe(
+                    export_datasets[export_name],
+                    export_format,
+                    lookups=id_lookups,
+                    metadata=export_filters,
+                )
+            st.sidebar.download_button(
+                "Baixar Arquivo",
+                data=export_buffer,
+                file_name=export_file_name(export_name, extension),
+                mime=mime,
+                key="sales_export_download",
+            )
+        except ValueError as e:
+            st.sidebar.error(str(e))
 else:
     st.warning("Não há dados para os filtros selecionados.")
@@ -1,8 +1,32 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import os
-from style_config import CSS, PRIMARY_COLOR, POSITIVE_COLOR, NEGATIVE_COLOR
+from aggregations import (
+    filter_logistics,
+    delivery_status_counts,
+    monthly_delivery_time,
+    state_performance,
+    lane_performance,
+    seller_performance,
+)
+from data_loader import load_logistics_data, decode_ids
+from quantile_sketch import build_sketch, quantiles_by_month, quantiles_by_group
+from prefix_index import (
+    COMPARISONS,
+    build_logistics_index,
+    select_cells,
+    compare_periods,
+    ratio,
+    absolute_delta,
+)
+from data_export import EXPORT_FORMATS, export_dataframe, export_file_name
+from style_config import (
+    CSS,
+    PRIMARY_COLOR,
+    POSITIVE_COLOR,
+    NEGATIVE_COLOR,
+    COLOR_SEQUENCE,
+    SEQUENTIAL_COLOR_SCALE,
+)
 
 # --- CONFIGURAÇÃO DA PÁGINA E CSS ---
 st.set_page_config(page_title="Análise de Logística", layout="wide")
@@ -13,80 +37,23 @@ st.markdown(CSS, unsafe_allow_html=True)
 # --- CARREGAMENTO DOS DADOS ---
 @st.cache_data
 def load_data():
-    data_path = "data/"
     try:
-        cols_orders = [
-            "order_id",
-            "customer_id",
-            "order_purchase_timestamp",
-            "order_delivered_customer_date",
-            "order_estimated_delivery_date",
-        ]
-        cols_items = ["order_id", "price"]
-        cols_customers = ["customer_id", "customer_unique_id", "customer_state"]
-
-        orders = pd.read_parquet(
-            os.path.join(data_path, "olist_orders_dataset.parquet"),
-            columns=cols_orders,
-            engine="fastparquet",
-        )
-        items = pd.read_parquet(
-            os.path.join(data_path, "olist_order_items_dataset.parquet"),
-            columns=cols_items,
-            engine="fastparquet",
-        )
-        customers = pd.read_parquet(
-            os.path.join(data_path, "olist_customers_dataset.parquet"),
-            columns=cols_customers,
-            engine="fastparquet",
-        )
-
+        df, id_lookups = load_logistics_data()
     except Exception as e:
         st.error(f"Erro ao ler os arquivos Parquet. Detalhe: {e}")
         st.stop()
-
-    df = orders.merge(customers, on="customer_id").merge(items, on="order_id")
-    for col in [
-        "order_purchase_timestamp",
-        "order_delivered_customer_date",
-        "order_estimated_delivery_date",
-    ]:
-        df[col] = pd.to_datetime(df[col], errors="coerce")
-    df.dropna(
-        subset=[
-            "order_purchase_timestamp",
-            "order_delivered_customer_date",
-            "order_estimated_delivery_date",
-        ],
-        inplace=True,
-    )
-    df["customer_state"] = df["customer_state"].astype("category")
-    return df
-
-
-# --- PROCESSAMENTO DOS DADOS DE LOGÍSTICA ---
-def process_logistics_data(df):
-    df["delivery_time"] = (
-        df["order_delivered_customer_date"] - df["order_purchase_timestamp"]
-    ).dt.days
-    df["estimated_time"] = (
-        df["order_estimated_delivery_date"] - df["order_purchase_timestamp"]
-    ).dt.days
-    df["delivery_delay"] = (
-        df["order_delivered_customer_date"] - df["order_estimated_delivery_date"]
-    ).dt.days
-    df = df[df["delivery_time"] >= 0]
-    df["delivery_status"] = (
-        df["delivery_delay"]
-        .apply(lambda x: "Atrasado" if x > 0 else "No Prazo")
-        .astype("category")
-    )
-    return df
+    sketches = {col: build_sketch(df, col) for col in PERCENTILE_METRICS.values()}
+    return df, id_lookups, sketches, build_logistics_index(df)
 
 
 # --- LÓGICA PRINCIPAL ---
-df_logistics = load_data()
-df_processed = process_logistics_data(df_logistics)
+PERCENTILE_METRICS = {"Tempo de Entrega": "delivery_time", "Atraso": "delivery_delay"}
+LANE_METRICS = {
+    "Volume": "volume",
+    "Tempo Médio": "avg_delivery_time",
+    "% Atraso": "delay_percentage",
+}
+df_processed, id_lookups, sketches, logistics_index = load_data()
 
 # --- FILTROS NA BARRA LATERAL ---
 st.sidebar.header("Filtros")
@@ -105,34 +72,71 @@ states_log = sorted(df_processed["customer_state"].cat.categories)
 selected_states_log = st.sidebar.multiselect(
     "Estado:", options=states_log, default=states_log, key="logistics_states"
 )
+comparison_log = st.sidebar.radio(
+    "Comparar com:", options=list(COMPARISONS), key="logistics_comparison"
+)
 start_date_log = pd.to_datetime(start_date_log)
 end_date_log = pd.to_datetime(end_date_log) + pd.Timedelta(days=1)
-query = "customer_state in @selected_states_log and order_purchase_timestamp >= @start_date_log and order_purchase_timestamp < @end_date_log"
-df_filtered_log = df_processed.query(query)
+df_filtered_log = filter_logistics(
+    df_processed, start_date_log, end_date_log, selected_states_log
+)
 
 # --- LAYOUT DO DASHBOARD ---
 if not df_filtered_log.empty:
-    avg_delivery_time = df_filtered_log["delivery_time"].mean()
-    avg_estimated_time = df_filtered_log["estimated_time"].mean()
-    delay_percentage = (
-        (df_filtered_log["delivery_status"] == "Atrasado").sum()
-        / len(df_filtered_log)
-        * 100
+    logistics_cells = select_cells(
+        logistics_index, {"customer_state": selected_states_log}
     )
+    current, previous = compare_periods(
+        logistics_index,
+        start_date_log,
+        end_date_log,
+        logistics_cells,
+        COMPARISONS[comparison_log],
+    )
+    avg_delivery_time = ratio(current, "delivery_days", "deliveries")
+    avg_estimated_time = ratio(current, "estimated_days", "deliveries")
+    delay_percentage = ratio(current, "late", "deliveries") * 100
+    previous_delay = ratio(previous, "late", "deliveries")
 
     kpi1, kpi2, kpi3 = st.columns(3)
-    kpi1.metric(label="Tempo Médio Entrega", value=f"{avg_delivery_time:.1f} Dias")
-    kpi2.metric(label="Tempo Médio Estimado", value=f"{avg_estimated_time:.1f} Dias")
-    kpi3.metric(label="% de Atrasos", value=f"{delay_percentage:.1f}%")
+    kpi1.metric(
+        label="Tempo Médio Entrega",
+        value=f"{avg_delivery_time:.1f} Dias",
+        delta=absolute_delta(
+            avg_delivery_time, ratio(previous, "delivery_days", "deliveries"), "Dias"
+        ),
+        delta_color="inverse",
+    )
+    kpi2.metric(
+        label="Tempo Médio Estimado",
+        value=f"{avg_estimated_time:.1f} Dias",
+        delta=absolute_delta(
+            avg_estimated_time, ratio(previous, "estimated_days", "deliveries"), "Dias"
+        ),
+        delta_color="inverse",
+    )
+    kpi3.metric(
+        label="% de Atrasos",
+        value=f"{delay_percentage:.1f}%",
+        delta=absolute_delta(
+            delay_percentage,
+            previous_delay * 100 if previous_delay is not None else None,
+            "p.p.",
+        ),
+        delta_color="inverse",
+    )
 
     st.markdown("---")
 
+    # O plotly.express só é importado depois dos KPIs, quando há gráficos
+    import plotly.express as px
+
     col1, col2 = st.columns([2, 3])
     with col1:
         st.markdown(
             '<p class="chart-title">Performance de Entrega</p>', unsafe_allow_html=True
         )
-        status_count = df_filtered_log["delivery_status"].value_counts()
+        status_count = delivery_status_counts(df_filtered_log)
         pull_values = [
             0.1 if label == "Atrasado" else 0 for label in status_count.index
         ]
@@ -167,14 +171,9 @@ if not df_filtered_log.empty:
             '<p class="chart-title">Tempo Médio de Entrega (Mensal)</p>',
             unsafe_allow_html=True,
         )
-        monthly_delivery_time = (
-            df_filtered_log.set_index("order_purchase_timestamp")
-            .resample("ME")["delivery_time"]
-            .mean()
-            .reset_index()
-        )
+        delivery_time_monthly = monthly_delivery_time(df_filtered_log)
         fig_line = px.line(
-            monthly_delivery_time,
+            delivery_time_monthly,
             x="order_purchase_timestamp",
             y="delivery_time",
             color_discrete_sequence=[PRIMARY_COLOR],
@@ -185,17 +184,7 @@ if not df_filtered_log.empty:
         )
         st.plotly_chart(fig_line, use_container_width=True)
 
-    state_performance = (
-        df_filtered_log.groupby("customer_state", observed=False)
-        .agg(
-            avg_delivery_time=("delivery_time", "mean"),
-            delay_percentage=(
-                "delivery_status",
-                lambda x: (x == "Atrasado").sum() / len(x) * 100,
-            ),
-        )
-        .reset_index()
-    )
+    performance_by_state = state_performance(df_filtered_log)
 
     col3, col4 = st.columns(2)
     with col3:
@@ -203,7 +192,7 @@ if not df_filtered_log.empty:
             '<p class="chart-title">Top 10 Estados (Maior Tempo)</p>',
             unsafe_allow_html=True,
         )
-        top_slowest_states = state_performance.nlargest(10, "avg_delivery_time")
+        top_slowest_states = performance_by_state.nlargest(10, "avg_delivery_time")
         fig_bar_time = px.bar(
             top_slowest_states.sort_values(by="avg_delivery_time"),
             x="avg_delivery_time",
@@ -223,7 +212,7 @@ if not df_filtered_log.empty:
             '<p class="chart-title">Top 10 Estados (Maior % Atraso)</p>',
             unsafe_allow_html=True,
         )
-        top_delayed_states = state_performance.nlargest(10, "delay_percentage")
+        top_delayed_states = performance_by_state.nlargest(10, "delay_percentage")
         fig_bar_delay = px.bar(
             top_delayed_states.sort_values(by="delay_percentage"),
             x="delay_percentage",
@@ -237,5 +226,183 @@ if not df_filtered_log.empty:
             margin=dict(l=10, r=10, t=20, b=20), xaxis_title="%", yaxis_title=None
         )
         st.plotly_chart(fig_bar_delay, use_container_width=True)
+
+    # --- PERCENTIS DE ENTREGA ---
+    st.markdown("---")
+    percentile_metric = st.radio(
+        "Percentis de:",
+        options=list(PERCENTILE_METRICS),
+        horizontal=True,
+        key="logistics_percentile_metric",
+    )
+    sketch = sketches[PERCENTILE_METRICS[percentile_metric]]
+    percentiles_monthly = quantiles_by_month(
+        sketch, start_date_log, end_date_log, selected_states_log
+    )
+    percentiles_by_state = quantiles_by_group(
+        sketch, start_date_log, end_date_log, selected_states_log
+    )
+
+    col5, col6 = st.columns([3, 2])
+    with col5:
+        st.markdown(
+            f'<p class="chart-title">{percentile_metric} p50/p90/p99 (Mensal)</p>',
+            unsafe_allow_html=True,
+        )
+        fig_percentiles = px.line(
+            percentiles_monthly,
+            x="order_purchase_timestamp",
+            y=["p50", "p90", "p99"],
+            color_discrete_sequence=COLOR_SEQUENCE,
+            height=225,
+        )
+        fig_percentiles.update_layout(
+            margin=dict(l=10, r=10, t=20, b=20),
+            yaxis_title="Dias",
+            xaxis_title=None,
+            legend_title_text="",
+        )
+        st.plotly_chart(fig_percentiles, use_container_width=True)
+
+    with col6:
+        st.markdown(
+            f'<p class="chart-title">Top 10 Estados por p90 ({percentile_metric})</p>',
+            unsafe_allow_html=True,
+        )
+        top_p90_states = percentiles_by_state.nlargest(10, "p90").sort_values(
+            by="p90"
+        )
+        fig_bar_percentiles = px.bar(
+            top_p90_states,
+            x=["p50", "p90", "p99"],
+            y="customer_state",
+            orientation="h",
+            barmode="group",
+            color_discrete_sequence=COLOR_SEQUENCE,
+            height=225,
+        )
+        fig_bar_percentiles.update_layout(
+            margin=dict(l=10, r=10, t=20, b=20),
+            xaxis_title="Dias",
+            yaxis_title=None,
+            legend_title_text="",
+        )
+        st.plotly_chart(fig_bar_percentiles, use_container_width=True)
+
+    # --- ROTAS VENDEDOR → CLIENTE ---
+    # Só disponível quando a tabela de vendedores foi convertida
+    has_sellers = "seller_state" in df_filtered_log.columns
+    if has_sellers:
+        st.markdown("---")
+        lane_metric = st.radio(
+            "Rotas por:",
+            options=list(LANE_METRICS),
+            horizontal=True,
+            key="logistics_lane_metric",
+        )
+        lanes = lane_performance(df_filtered_log)
+
+        col7, col8 = st.columns([3, 2])
+        with col7:
+            st.markdown(
+                f'<p class="chart-title">{lane_metric} por Rota '
+                "(Estado do Vendedor → Estado do Cliente)</p>",
+                unsafe_allow_html=True,
+            )
+            lane_matrix = lanes.pivot(
+                index="seller_state",
+                columns="customer_state",
+                values=LANE_METRICS[lane_metric],
+            )
+            fig_lanes = px.imshow(
+                lane_matrix,
+                color_continuous_scale=SEQUENTIAL_COLOR_SCALE,
+                aspect="auto",
+                height=400,
+            )
+            fig_lanes.update_layout(
+                margin=dict(l=10, r=10, t=20, b=20),
+                xaxis_title="Cliente",
+                yaxis_title="Vendedor",
+                coloraxis_colorbar_title_text="",
+            )
+            st.plotly_chart(fig_lanes, use_container_width=True)
+
+        with col8:
+            st.markdown(
+                '<p class="chart-title">Top 20 Vendedores por Volume</p>',
+                unsafe_allow_html=True,
+            )
+            seller_states = sorted(lanes["seller_state"].unique())
+            selected_seller_state = st.selectbox(
+                "Estado do vendedor:",
+                options=["Todos"] + seller_states,
+                key="logistics_seller_state",
+            )
+            top_sellers = seller_performance(
+                df_filtered_log,
+                seller_state=(
+                    None if selected_seller_state == "Todos" else selected_seller_state
+                ),
+            )
+            st.dataframe(
+                decode_ids(top_sellers, id_lookups).rename(
+                    columns={
+                        "seller_id": "Vendedor",
+                        "seller_state": "UF",
+                        "seller_city": "Cidade",
+                        "volume": "Itens",
+                        "avg_delivery_time": "Tempo Médio (Dias)",
+                        "delay_percentage": "% Atraso",
+                    }
+                ),
+                hide_index=True,
+                height=325,
+                use_container_width=True,
+            )
+
+    # --- EXPORTAÇÃO DOS DADOS ---
+    st.sidebar.markdown("---")
+    st.sidebar.header("Exportar")
+    export_datasets = {
+        "Dados Filtrados": df_filtered_log,
+        "Performance de Entrega": status_count.reset_index(),
+        "Tempo Médio Mensal": delivery_time_monthly,
+        "Performance por Estado": performance_by_state,
+        "Percentis Mensais": percentiles_monthly,
+        "Percentis por Estado": percentiles_by_state,
+    }
+    if has_sellers:
+        export_datasets["Rotas Vendedor-Cliente"] = lanes
+        export_datasets["Top Vendedores"] = top_sellers
+    export_filters = {
+        "start_date": start_date_log.date(),
+        "end_date": (end_date_log - pd.Timedelta(days=1)).date(),
+        "states": selected_states_log,
+    }
+    export_name = st.sidebar.selectbox(
+        "Conjunto:", options=list(export_datasets), key="logistics_export_dataset"
+    )
+    export_format = st.sidebar.selectbox(
+        "Formato:", options=list(EXPORT_FORMATS), key="logistics_export_format"
+    )
+    if st.sidebar.button("Preparar Arquivo", key="logistics_export_prepare"):
+        try:
+            with st.spinner("Gerando o arquivo de exportação..."):
+                export_buffer, extension, mime = export_dataframe(
+                    export_datasets[export_name],
+                    export_format,
+                    lookups=id_lookups,
+                    metadata=export_filters,
+                )
+            st.sidebar.download_button(
+                "Baixar Arquivo",
+                data=export_buffer,
+                file_name=export_file_name(export_name, extension),
+                mime=mime,
+                key="logistics_export_download",
+            )
+        except ValueError as e:
+            st.sidebar.error(str(e))
 else:
     st.warning("Não há dados de logística para os filtros selecionados.")
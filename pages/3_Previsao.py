@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import os
-from prophet import Prophet
+from aggregations import daily_revenue
+from data_loader import load_forecast_data
+from forecasting import fit_forecast
 from style_config import CSS, PRIMARY_COLOR, SECONDARY_COLOR
 
 # --- CONFIGURAÇÃO DA PÁGINA E CSS ---
@@ -14,39 +13,17 @@ st.markdown(CSS, unsafe_allow_html=True)
 
 # --- CARREGAMENTO DOS DADOS ---
 @st.cache_data
-def load_forecast_data():
-    data_path = "data/"
+def load_data():
     try:
-        cols_orders = ["order_id", "order_purchase_timestamp"]
-        cols_items = ["order_id", "price"]
-
-        orders = pd.read_parquet(
-            os.path.join(data_path, "olist_orders_dataset.parquet"),
-            columns=cols_orders,
-            engine="fastparquet",
-        )
-        items = pd.read_parquet(
-            os.path.join(data_path, "olist_order_items_dataset.parquet"),
-            columns=cols_items,
-            engine="fastparquet",
-        )
+        return load_forecast_data()
     except Exception as e:
         st.error(f"Erro ao ler os arquivos Parquet. Detalhe: {e}")
         st.stop()
-    df = orders.merge(items, on="order_id")
-    df["order_purchase_timestamp"] = pd.to_datetime(df["order_purchase_timestamp"])
-    return df
 
 
 # --- LÓGICA PRINCIPAL ---
-df_forecast = load_forecast_data()
-df_prophet = df_forecast[["order_purchase_timestamp", "price"]].copy()
-df_prophet = (
-    df_prophet.set_index("order_purchase_timestamp").resample("D").sum().reset_index()
-)
-df_prophet.rename(
-    columns={"order_purchase_timestamp": "ds", "price": "y"}, inplace=True
-)
+df_forecast = load_data()
+df_prophet = daily_revenue(df_forecast)
 
 # --- FILTROS NA BARRA LATERAL ---
 st.sidebar.header("Parâmetros")
@@ -62,14 +39,14 @@ st.markdown(
 )
 
 if st.button("Gerar Previsão"):
+    # Plotly e Prophet (dentro de fit_forecast) só são importados quando a previsão
+    # é pedida
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     with st.spinner("Treinando o modelo e gerando a previsão..."):
         # --- TREINAMENTO E PREVISÃO ---
-        model = Prophet(
-            yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False
-        )
-        model.fit(df_prophet)
-        future = model.make_future_dataframe(periods=prediction_period * 30)
-        forecast = model.predict(future)
+        forecast = fit_forecast(df_prophet, prediction_period)
 
         # --- VISUALIZAÇÃO DOS RESULTADOS ---
         st.markdown("---")
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURAÇÃO DAS COMPARAÇÕES ---
+COMPARISONS = {"Período Anterior": "previous", "Ano Anterior": "yoy"}
+
+
+# --- CONSTRUÇÃO ---
+def build_prefix_index(
+    df, metrics, group_columns, date_column="order_purchase_timestamp"
+):
+    # Somas acumuladas diárias de cada métrica por célula (combinação dos grupos,
+    # ex: estado x categoria). O total de qualquer período é cum[fim] - cum[início],
+    # então o custo de um KPI não depende do tamanho do histórico.
+    days = df[date_column].to_numpy().astype("datetime64[D]").astype(np.int64)
+    first_day = int(days.min()) if len(days) else 0
+    n_days = int(days.max()) - first_day + 1 if len(days) else 1
+
+    groups = {col: list(df[col].cat.categories) for col in group_columns}
+    shape = tuple(max(len(categories), 1) for categories in groups.values())
+    codes = [df[col].cat.codes.to_numpy() for col in group_columns]
+    valid = np.logical_and.reduce([c >= 0 for c in codes])
+    cells = np.ravel_multi_index([c[valid] for c in codes], shape)
+    n_cells = int(np.prod(shape))
+    flat = (days[valid] - first_day) * n_cells + cells
+
+    cumulative = {}
+    for name, values in metrics.items():
+        values = np.asarray(values)[valid]
+        daily = np.bincount(flat, weights=values, minlength=n_days * n_cells)
+        dtype = np.float64 if np.issubdtype(values.dtype, np.floating) else np.int32
+        cum = np.zeros((n_days + 1, n_cells), dtype=dtype)
+        cum[1:] = np.cumsum(daily.reshape(n_days, n_cells), axis=0)
+        cumulative[name] = cum
+
+    return {
+        "first_day": first_day,
+        "n_days": n_days,
+        "groups": groups,
+        "shape": shape,
+        "cumulative": cumulative,
+    }
+
+
+def build_sales_index(df):
+    # Só a receita: contagens distintas (pedidos, clientes) não podem ser combinadas
+    # entre dias e células e são calculadas nas linhas filtradas. As linhas são
+    # item x pagamento, então contá-las também não daria o número de itens.
+    metrics = {"revenue": df["price"].to_numpy(np.float64)}
+    return build_prefix_index(
+        df, metrics, ["customer_state", "product_category_name_english"]
+    )
+
+
+def build_logistics_index(df):
+    metrics = {
+        "deliveries": np.ones(len(df), dtype=np.int32),
+        "delivery_days": df["delivery_time"].to_numpy(np.float64),
+        "estimated_days": df["estimated_time"].to_numpy(np.float64),
+        "late": (df["delivery_status"] == "Atrasado").to_numpy(np.int32),
+    }
+    return build_prefix_index(df, metrics, ["customer_state"])
+
+
+# --- CONSULTA ---
+def select_cells(index, selections):
+    # selections: coluna -> lista de valores (None = todos)
+    selected_codes = []
+    for col, categories in index["groups"].items():
+        chosen = selections.get(col)
+        if chosen is None:
+            selected_codes.append(np.arange(len(categories)))
+        else:
+            positions = {value: i for i, value in enumerate(categories)}
+            selected_codes.append(
+                np.array([positions[v] for v in chosen if v in positions], dtype=int)
+            )
+    if any(len(c) == 0 for c in selected_codes):
+        return np.array([], dtype=np.int64)
+    return np.ravel_multi_index(np.ix_(*selected_codes), index["shape"]).ravel()
+
+
+def _day(date):
+    day = pd.Timestamp(date).to_datetime64().astype("datetime64[D]")
+    return int(day.astype(np.int64))
+
+
+def _day_position(index, date):
+    return int(np.clip(_day(date) - index["first_day"], 0, index["n_days"]))
+
+
+def range_totals(index, start_date, end_date, cells):
+    # end_date é exclusivo, como nos filtros das páginas
+    lo = _day_position(index, start_date)
+    hi = _day_position(index, end_date)
+    return {
+        name: cum[hi, cells].sum() - cum[lo, cells].sum()
+        for name, cum in index["cumulative"].items()
+    }
+
+
+def comparison_period(start_date, end_date, mode):
+    if mode == "yoy":
+        offset = pd.DateOffset(years=1)
+        return start_date - offset, end_date - offset
+    length = end_date - start_date
+    return start_date - length, start_date
+
+
+def _has_comparison(index, start_date, end_date, mode):
+    # Uma janela de comparação que começa antes do histórico seria cortada e
+    # comparada com um período mais curto, inflando a variação
+    previous_start, _ = comparison_period(start_date, end_date, mode)
+    return _day(previous_start) >= index["first_day"]
+
+
+def compare_periods(index, start_date, end_date, cells, mode):
+    # previous é None quando não há histórico completo para a comparação
+    current = range_totals(index, start_date, end_date, cells)
+    if not _has_comparison(index, start_date, end_date, mode):
+        return current, None
+    previous_start, previous_end = comparison_period(start_date, end_date, mode)
+    previous = range_totals(index, previous_start, previous_end, cells)
+    return current, previous
+
+
+# --- FORMATAÇÃO DOS DELTAS ---
+def ratio(totals, numerator, denominator):
+    if totals is None or not totals[denominator]:
+        return None
+    return totals[numerator] / totals[denominator]
+
+
+def percent_delta(current, previous):
+    if current is None or not previous:
+        return None
+    delta = round((current - previous) / previous * 100, 1)
+    return "0.0%" if delta == 0 else f"{delta:+.1f}%"
+
+
+def absolute_delta(current, previous, unit):
+    if current is None or previous is None:
+        return None
+    # Arredonda antes de formatar: "-0.0" seria exibido como queda pelo st.metric
+    delta = round(current - previous, 1)
+    if delta == 0:
+        return f"0.0 {unit}"
+    return f"{delta:+.1f} {unit}"
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURAÇÃO DOS SKETCHES ---
+QUANTILES = [0.5, 0.9, 0.99]
+
+
+# --- CONSTRUÇÃO ---
+def build_sketch(
+    df,
+    value_column,
+    date_column="order_purchase_timestamp",
+    group_column="customer_state",
+):
+    # Um histograma por (dia, estado). Os tempos de entrega são dias inteiros, então
+    # cada histograma é exato e dois deles se combinam somando as contagens: qualquer
+    # período/seleção de estados é respondido sem reordenar as linhas originais.
+    groups = list(df[group_column].cat.categories)
+    days = df[date_column].to_numpy().astype("datetime64[D]").astype(np.int64)
+    group_codes = df[group_column].cat.codes.to_numpy().astype(np.int64)
+    values = df[value_column].to_numpy().astype(np.int64)
+
+    min_value = int(values.min()) if len(values) else 0
+    n_bins = int(values.max()) - min_value + 1 if len(values) else 1
+    n_groups = max(len(groups), 1)
+    first_day = int(days.min()) if len(days) else 0
+
+    # Chave única ordenada por dia, estado e valor; np.unique já devolve ordenado
+    keys = (days - first_day) * n_groups + group_codes
+    keys = keys * n_bins + (values - min_value)
+    keys, counts = np.unique(keys, return_counts=True)
+    bins = keys % n_bins
+    group_codes = (keys // n_bins) % n_groups
+    days = keys // (n_bins * n_groups) + first_day
+
+    return {
+        "day": days,
+        "group": group_codes.astype(np.int16),
+        "bin": bins.astype(np.int32),
+        "count": counts.astype(np.int64),
+        "groups": groups,
+        "min_value": min_value,
+        "n_bins": n_bins,
+    }
+
+
+# --- CONSULTA ---
+def _to_day(date):
+    return pd.Timestamp(date).to_datetime64().astype("datetime64[D]").astype(np.int64)
+
+
+def _select(sketch, start_date, end_date, groups):
+    # end_date é exclusivo, como nos filtros das páginas
+    lo, hi = 0, len(sketch["day"])
+    if start_date is not None:
+        start_day = _to_day(start_date)
+        lo = np.searchsorted(sketch["day"], start_day, side="left")
+    if end_date is not None:
+        end_day = _to_day(end_date)
+        hi = np.searchsorted(sketch["day"], end_day, side="left")
+    selected = slice(lo, hi)
+    mask = np.ones(hi - lo, dtype=bool)
+    if groups is not None:
+        codes = [sketch["groups"].index(g) for g in groups if g in sketch["groups"]]
+        mask = np.isin(sketch["group"][selected], codes)
+    return {
+        key: sketch[key][selected][mask] for key in ["day", "group", "bin", "count"]
+    }
+
+
+def _merge(keys, n_keys, bins, counts, n_bins):
+    # Soma os histogramas de cada chave em uma matriz (n_keys x n_bins)
+    merged = np.bincount(
+        keys * n_bins + bins, weights=counts, minlength=n_keys * n_bins
+    )
+    return merged.reshape(n_keys, n_bins)
+
+
+def _quantiles(histograms, min_value, quantiles):
+    # Quantil por posição: o menor valor cuja contagem acumulada atinge q * total
+    cumulative = np.cumsum(histograms, axis=1)
+    totals = cumulative[:, -1]
+    result = {}
+    for q in quantiles:
+        target = np.maximum(np.ceil(q * totals), 1)
+        position = (cumulative < target[:, None]).sum(axis=1)
+        values = (position + min_value).astype(float)
+        values[totals == 0] = np.nan
+        result[f"p{round(q * 100)}"] = values
+    return result
+
+
+def quantiles_by_month(sketch, start_date, end_date, groups=None, quantiles=QUANTILES):
+    selected = _select(sketch, start_date, end_date, groups)
+    months = selected["day"].astype("datetime64[D]").astype("datetime64[M]")
+    unique_months, month_codes = np.unique(months.astype(np.int64), return_inverse=True)
+    histograms = _merge(
+        month_codes.astype(np.int64),
+        len(unique_months),
+        selected["bin"],
+        selected["count"],
+        sketch["n_bins"],
+    )
+    # Rótulo no fim do mês, como o resample("ME") dos gráficos de média
+    month_end = (unique_months + 1).astype("datetime64[M]").astype(
+        "datetime64[D]"
+    ) - np.timedelta64(1, "D")
+    return pd.DataFrame(
+        {
+            "order_purchase_timestamp": pd.to_datetime(month_end),
+            **_quantiles(histograms, sketch["min_value"], quantiles),
+        }
+    )
+
+
+def quantiles_by_group(sketch, start_date, end_date, groups=None, quantiles=QUANTILES):
+    selected = _select(sketch, start_date, end_date, groups)
+    n_groups = len(sketch["groups"])
+    histograms = _merge(
+        selected["group"].astype(np.int64),
+        n_groups,
+        selected["bin"],
+        selected["count"],
+        sketch["n_bins"],
+    )
+    result = pd.DataFrame(
+        {
+            "customer_state": sketch["groups"],
+            **_quantiles(histograms, sketch["min_value"], quantiles),
+        }
+    )
+    return result.dropna().reset_index(drop=True)
@@ -0,0 +1,210 @@
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# --- CONFIGURAÇÃO DO BENCHMARK ---
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAGES = [
+    "app.py",
+    "pages/1_Vendas.py",
+    "pages/2_Logistica.py",
+    "pages/3_Previsao.py",
+]
+BUDGET_FILE = os.path.join(ROOT, "startup_budget.json")
+METRICS = ["import_ms", "render_ms", "rss_mb"]
+# Folga absoluta somada à tolerância: sem ela, métricas perto de zero (ex: os
+# imports do app.py, já cobertos pelo Streamlit) falhariam por ruído
+MIN_SLACK = {"import_ms": 20, "render_ms": 20, "rss_mb": 5}
+FORECAST_MODULES = ["prophet", "cmdstanpy", "matplotlib", "holidays"]
+# O pacote plotly (e o plotly.graph_objects) já vem com o `import streamlit`; o
+# custo que as páginas adiam é o do plotly.express
+PLOTLY_MODULES = ["plotly.express", "plotly.graph_objects"]
+HEAVY_MODULES = FORECAST_MODULES + ["openpyxl"] + PLOTLY_MODULES
+# Módulos que as páginas não podem carregar até o primeiro render. A comparação é
+# feita contra um `import streamlit` puro no mesmo processo: o que o próprio
+# Streamlit já carrega não conta. Vendas e Logística desenham gráficos no primeiro
+# render, então o plotly.express é esperado nelas.
+FORBIDDEN_MODULES = {
+    "app.py": HEAVY_MODULES,
+    "pages/1_Vendas.py": FORECAST_MODULES + ["openpyxl"],
+    "pages/2_Logistica.py": FORECAST_MODULES + ["openpyxl"],
+    "pages/3_Previsao.py": HEAVY_MODULES,
+}
+
+# Executado em um processo novo para cada medição, sem cache de módulos
+PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import streamlit
+streamlit_ms = (time.perf_counter() - started) * 1000
+baseline = [m for m in {heavy!r} if m in sys.modules]
+# Só os imports da própria página, sem o custo fixo do Streamlit
+started = time.perf_counter()
+{imports}
+import_ms = (time.perf_counter() - started) * 1000
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout=120)
+started = time.perf_counter()
+at.run()
+render_ms = (time.perf_counter() - started) * 1000
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rss_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+print(json.dumps({{
+    "streamlit_ms": streamlit_ms,
+    "import_ms": import_ms,
+    "render_ms": render_ms,
+    "rss_mb": rss_mb,
+    "errors": [str(e.value) for e in at.exception],
+    "baseline_modules": baseline,
+    "heavy_modules": [
+        m for m in {heavy!r} if m in sys.modules and m not in baseline
+    ],
+}}))
+"""
+
+
+# --- MEDIÇÃO ---
+def top_level_imports(path):
+    # Apenas os imports no topo do arquivo: é o custo pago antes de qualquer render
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes)
+
+
+def measure_page(path, env):
+    probe = PROBE.format(
+        root=ROOT,
+        imports=top_level_imports(path),
+        path=os.path.join(ROOT, path),
+        heavy=HEAVY_MODULES,
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Falha ao medir '{path}':\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_all(repeat, orders):
+    from synthetic_data import write_synthetic_data
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_path:
+        write_synthetic_data(data_path, n_orders=orders)
+        env = {**os.environ, "DASHBOARD_DATA_PATH": data_path}
+        for path in PAGES:
+            runs = [measure_page(path, env) for _ in range(repeat)]
+            results[path] = {
+                **{m: statistics.median(r[m] for r in runs) for m in METRICS},
+                "streamlit_ms": statistics.median(r["streamlit_ms"] for r in runs),
+                "errors": sorted({e for r in runs for e in r["errors"]}),
+                "baseline_modules": sorted(
+                    {m for r in runs for m in r["baseline_modules"]}
+                ),
+                "heavy_modules": sorted(
+                    {m for r in runs for m in r["heavy_modules"]}
+                ),
+            }
+    return results
+
+
+# --- VERIFICAÇÃO DO ORÇAMENTO ---
+def check(results, budget, tolerance):
+    failures = []
+    for path, result in results.items():
+        for error in result["errors"]:
+            failures.append(f"{path}: exceção no primeiro render: {error}")
+        loaded = set(result["heavy_modules"]) & set(FORBIDDEN_MODULES[path])
+        if loaded:
+            failures.append(
+                f"{path}: módulos pesados carregados na inicialização: "
+                f"{', '.join(sorted(loaded))}"
+            )
+        for metric in METRICS:
+            limit = budget.get(path, {}).get(metric)
+            if limit is None:
+                continue
+            if result[metric] > limit * (1 + tolerance) + MIN_SLACK[metric]:
+                failures.append(
+                    f"{path}: {metric} = {result[metric]:.0f} excede o orçamento "
+                    f"de {limit:.0f} (+{tolerance:.0%})"
+                )
+    return failures
+
+
+def print_results(results, budget):
+    header = f"{'página':<24}{'import ms':>12}{'render ms':>12}{'RSS MB':>10}"
+    print(f"{header}  orçamento")
+    for path, result in results.items():
+        limits = budget.get(path, {})
+        budget_text = " / ".join(f"{limits[m]:.0f}" for m in METRICS if m in limits)
+        print(
+            f"{path:<24}{result['import_ms']:>12.0f}{result['render_ms']:>12.0f}"
+            f"{result['rss_mb']:>10.0f}  {budget_text or '-'}"
+        )
+    streamlit_ms = statistics.median(r["streamlit_ms"] for r in results.values())
+    print(f"(import ms exclui o `import streamlit` base: {streamlit_ms:.0f} ms)")
+
+
+# --- EXECUÇÃO ---
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede import, primeiro render e memória de cada página."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Grava as medições atuais como o novo orçamento",
+    )
+    parser.add_argument(
+        "--no-budget",
+        action="store_true",
+        help="Verifica apenas os imports quando não há arquivo de orçamento",
+    )
+    args = parser.parse_args()
+
+    results = measure_all(args.repeat, args.orders)
+    if args.record:
+        budget = {path: {m: r[m] for m in METRICS} for path, r in results.items()}
+        with open(args.budget, "w") as f:
+            json.dump(budget, f, indent=2)
+        print(f"Orçamento gravado em '{args.budget}'.")
+    elif os.path.exists(args.budget):
+        with open(args.budget) as f:
+            budget = json.load(f)
+    else:
+        budget = {}
+
+    print_results(results, budget)
+    failures = check(results, budget, args.tolerance)
+    if not budget and not args.no_budget:
+        # Sem orçamento não há como detectar regressões de tempo e memória
+        failures.append(
+            f"orçamento '{args.budget}' não encontrado; grave um com --record "
+            "ou use --no-budget para verificar apenas os imports"
+        )
+    elif not budget:
+        print(f"AVISO: '{args.budget}' não encontrado; verificando apenas os imports.")
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
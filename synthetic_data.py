@@ -0,0 +1,152 @@
+import os
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURAÇÃO DOS DADOS SINTÉTICOS ---
+STATES = [
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+]  # fmt: skip
+CATEGORIES = {
+    "beleza_saude": "health_beauty",
+    "cama_mesa_banho": "bed_bath_table",
+    "esporte_lazer": "sports_leisure",
+    "informatica_acessorios": "computers_accessories",
+    "moveis_decoracao": "furniture_decor",
+    "relogios_presentes": "watches_gifts",
+    "telefonia": "telephony",
+    "utilidades_domesticas": "housewares",
+    "automotivo": "auto",
+    "brinquedos": "toys",
+}
+SELLER_CITIES = [
+    "sao paulo",
+    "curitiba",
+    "rio de janeiro",
+    "belo horizonte",
+    "ibitinga",
+]
+# Vendedores concentrados no Sudeste/Sul, como no dataset original
+SELLER_STATE_WEIGHTS = np.where(
+    np.isin(STATES, ["SP", "PR", "MG", "RJ", "SC", "RS"]), 10.0, 0.2
+)
+SELLER_STATE_WEIGHTS = SELLER_STATE_WEIGHTS / SELLER_STATE_WEIGHTS.sum()
+PAYMENT_TYPES = ["credit_card", "boleto", "voucher", "debit_card"]
+PAYMENT_WEIGHTS = [0.74, 0.19, 0.05, 0.02]
+
+
+def random_hex_ids(rng, size):
+    # Ids hexadecimais de 32 caracteres, no mesmo formato do dataset da Olist
+    halves = rng.integers(0, 2**63, size=(size, 2), dtype=np.int64)
+    return np.array([f"{hi:016x}{lo:016x}" for hi, lo in halves], dtype=object)
+
+
+def format_timestamps(values):
+    # Os Parquet convertidos do CSV guardam as datas como texto
+    formatted = pd.Series(values).dt.strftime("%Y-%m-%d %H:%M:%S")
+    return formatted.astype(object).where(formatted.notna(), None).to_numpy()
+
+
+# --- GERAÇÃO DAS TABELAS ---
+def generate_tables(
+    n_orders=20_000,
+    n_products=2_000,
+    n_sellers=500,
+    start="2016-09-01",
+    days=730,
+    seed=42,
+):
+    rng = np.random.default_rng(seed)
+
+    n_customers = int(n_orders * 0.97)
+    customer_unique_ids = random_hex_ids(rng, max(1, int(n_customers * 0.96)))
+    customers = pd.DataFrame(
+        {
+            "customer_id": random_hex_ids(rng, n_customers),
+            "customer_unique_id": rng.choice(customer_unique_ids, n_customers),
+            "customer_state": rng.choice(STATES, n_customers),
+        }
+    )
+
+    purchase = pd.Timestamp(start) + pd.to_timedelta(
+        rng.uniform(0, days, n_orders), unit="D"
+    )
+    estimated = purchase.normalize() + pd.to_timedelta(
+        rng.integers(10, 45, n_orders), unit="D"
+    )
+    delivered = purchase + pd.to_timedelta(rng.gamma(3.0, 4.0, n_orders), unit="D")
+    delivered = delivered.where(rng.random(n_orders) > 0.03)  # pedidos não entregues
+    orders = pd.DataFrame(
+        {
+            "order_id": random_hex_ids(rng, n_orders),
+            "customer_id": rng.choice(customers["customer_id"].to_numpy(), n_orders),
+            "order_purchase_timestamp": format_timestamps(purchase),
+            "order_delivered_customer_date": format_timestamps(delivered),
+            "order_estimated_delivery_date": format_timestamps(estimated),
+        }
+    )
+
+    products = pd.DataFrame(
+        {
+            "product_id": random_hex_ids(rng, n_products),
+            "product_category_name": rng.choice(list(CATEGORIES), n_products),
+        }
+    )
+    translation = pd.DataFrame(
+        {
+            "product_category_name": list(CATEGORIES),
+            "product_category_name_english": list(CATEGORIES.values()),
+        }
+    )
+
+    sellers = pd.DataFrame(
+        {
+            "seller_id": random_hex_ids(rng, n_sellers),
+            "seller_city": rng.choice(SELLER_CITIES, n_sellers),
+            "seller_state": rng.choice(STATES, n_sellers, p=SELLER_STATE_WEIGHTS),
+        }
+    )
+
+    items_per_order = rng.choice([1, 2, 3], n_orders, p=[0.88, 0.09, 0.03])
+    item_order_ids = np.repeat(orders["order_id"].to_numpy(), items_per_order)
+    items = pd.DataFrame(
+        {
+            "order_id": item_order_ids,
+            "product_id": rng.choice(
+                products["product_id"].to_numpy(), len(item_order_ids)
+            ),
+            "seller_id": rng.choice(
+                sellers["seller_id"].to_numpy(), len(item_order_ids)
+            ),
+            "price": rng.lognormal(4.4, 0.9, len(item_order_ids)).round(2),
+        }
+    )
+
+    order_totals = items.groupby("order_id", sort=False)["price"].sum()
+    n_payments = len(order_totals)
+    payments = pd.DataFrame(
+        {
+            "order_id": order_totals.index.to_numpy(),
+            "payment_type": rng.choice(PAYMENT_TYPES, n_payments, p=PAYMENT_WEIGHTS),
+            "payment_value": (
+                order_totals.to_numpy() * rng.uniform(1.0, 1.3, n_payments)
+            ).round(2),
+        }
+    )
+
+    return {
+        "olist_customers_dataset.parquet": customers,
+        "olist_orders_dataset.parquet": orders,
+        "olist_order_items_dataset.parquet": items,
+        "olist_order_payments_dataset.parquet": payments,
+        "olist_products_dataset.parquet": products,
+        "olist_sellers_dataset.parquet": sellers,
+        "product_category_name_translation.parquet": translation,
+    }
+
+
+def write_synthetic_data(path, **kwargs):
+    os.makedirs(path, exist_ok=True)
+    for file_name, df in generate_tables(**kwargs).items():
+        df.to_parquet(os.path.join(path, file_name), engine="fastparquet")
+    return path